@@ -8,7 +8,7 @@ import uuid
 from typing import List, Optional
 
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException
-from fastapi.responses import Response
+from fastapi.responses import Response, ORJSONResponse
 from pydantic import BaseModel
 
 from services.li_project import (
@@ -189,10 +189,12 @@ async def filter_nodes(request: FilterNodesRequest):
         return {"success": False, "error": str(e)}
 
 
-@router.post("/generate-project")
+@router.post("/generate-project", response_class=ORJSONResponse)
 async def generate_project(request: GenerateProjectRequest):
     """
     Generate the final LI project GeoJSON.
+    Serialized with orjson — the FeatureCollection can hold thousands of
+    polygons and stdlib json dominates response time on coordinate arrays.
     """
     try:
         geojson, filename = build_li_project_geojson(
@@ -243,7 +245,7 @@ async def count_nodes_endpoint(request: CountNodesRequest):
         return {"success": False, "error": f"Error counting nodes: {str(e)}"}
 
 
-@router.post("/buffer-polygon")
+@router.post("/buffer-polygon", response_class=ORJSONResponse)
 async def buffer_polygon(request: BufferPolygonRequest):
     """
     Create buffer polygons around a given polygon geometry.
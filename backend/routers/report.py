@@ -3,8 +3,9 @@ AOI Report Generator Router
 API endpoints for generating PDF visitor analysis reports.
 """
 
-import io
-import base64
+import os
+import pybase64
+import tempfile
 from typing import List, Optional
 
 from fastapi import APIRouter, HTTPException
@@ -55,10 +56,14 @@ async def report_login(request: ReportLoginRequest):
 
 
 @router.post("/generate")
-async def generate_report(request: GenerateReportRequest):
+def generate_report(request: GenerateReportRequest):
     """
     Generate a PDF report with visitor analysis.
     Returns JSON with base64-encoded PDF, chart images, and summary statistics.
+
+    Deliberately sync (runs in the threadpool): generate_pdf_report drives
+    its own asyncio event loop for the HTTP fan-out and blocks on matplotlib,
+    neither of which belongs on the server's main loop.
     """
     if not request.months:
         raise HTTPException(status_code=400, detail="At least one month must be selected")
@@ -70,22 +75,31 @@ async def generate_report(request: GenerateReportRequest):
         raise HTTPException(status_code=400, detail="AOI ID is required")
 
     try:
-        pdf_bytes, summary = generate_pdf_report(
-            token=request.token,
-            root_url=request.root_url,
-            project_id=request.project_id.strip(),
-            aoi_id=request.aoi_id.strip(),
-            months=sorted(request.months)
-        )
+        # Stream the PDF to a temp file and encode from the mmap view —
+        # avoids holding two full copies of a multi-MB report in memory
+        fd, tmp_path = tempfile.mkstemp(suffix=".pdf", prefix="aoi_report_")
+        os.close(fd)
+        try:
+            pdf_bytes, summary = generate_pdf_report(
+                token=request.token,
+                root_url=request.root_url,
+                project_id=request.project_id.strip(),
+                aoi_id=request.aoi_id.strip(),
+                months=sorted(request.months),
+                out_path=tmp_path
+            )
+            try:
+                pdf_b64 = pybase64.b64encode_as_string(pdf_bytes)
+            finally:
+                pdf_bytes.close()
+        finally:
+            os.unlink(tmp_path)
 
         # Create filename
         sorted_months = sorted(request.months)
         months_tag = f"{sorted_months[0]}_to_{sorted_months[-1]}" if len(sorted_months) > 1 else sorted_months[0]
         filename = f"report_{request.aoi_id}_{months_tag}.pdf"
 
-        # Encode PDF as base64
-        pdf_b64 = base64.b64encode(pdf_bytes).decode('utf-8')
-
         return JSONResponse(content={
             "success": True,
             "filename": filename,
@@ -5,14 +5,18 @@ buffer filtering, and AOI project assembly for LI projects.
 """
 
 import io
+import os
 import time
 import json
 from typing import List, Dict, Any, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 
 import pandas as pd
 import numpy as np
 import geopandas as gpd
 import requests
+import shapely
 from shapely.geometry import Point, Polygon, shape, mapping
 from shapely.ops import transform
 import pyproj
@@ -20,6 +24,15 @@ import pyproj
 from services.aoi import generate_aoi_project
 
 
+# Shared session with connection pooling: retries and repeated calls to
+# Overpass/Nominatim reuse the same TCP/TLS connection instead of paying a
+# fresh handshake per requests.get.
+_session = requests.Session()
+_adapter = requests.adapters.HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=0)
+_session.mount('http://', _adapter)
+_session.mount('https://', _adapter)
+
+
 # ==========================================
 # NODE PROCESSING
 # ==========================================
@@ -101,7 +114,7 @@ def search_by_name(query: str, country_code: str = "", limit: int = 10) -> List[
     }
     
     try:
-        response = requests.get(
+        response = _session.get(
             nominatim_url,
             params=params,
             headers=headers,
@@ -133,6 +146,16 @@ def search_by_name(query: str, country_code: str = "", limit: int = 10) -> List[
 # ESTABLISHMENT POLYGON (OVERPASS)
 # ==========================================
 
+# Shared query template, formatted per call. The combined regex tag filter
+# makes Overpass do a single index lookup instead of three separate nwr
+# passes over building/amenity/shop.
+_OVERPASS_QUERY_TPL = """
+[out:json][timeout:25];
+nwr(around:{radius},{lat},{lon})[~"^(building|amenity|shop)$"~".*"];
+out geom;
+"""
+
+
 def get_establishment_polygon(
     lat: float,
     lon: float,
@@ -146,15 +169,7 @@ def get_establishment_polygon(
     """
     overpass_url = "http://overpass-api.de/api/interpreter"
     
-    overpass_query = f"""
-    [out:json][timeout:25];
-    (
-      nwr(around:{radius},{lat},{lon})["building"];
-      nwr(around:{radius},{lat},{lon})["amenity"];
-      nwr(around:{radius},{lat},{lon})["shop"];
-    );
-    out geom;
-    """
+    overpass_query = _OVERPASS_QUERY_TPL.format(radius=radius, lat=lat, lon=lon)
     
     for attempt in range(max_retries):
         try:
@@ -162,7 +177,7 @@ def get_establishment_polygon(
                 wait_time = 2 ** attempt
                 time.sleep(wait_time)
             
-            response = requests.get(
+            response = _session.get(
                 overpass_url,
                 params={'data': overpass_query},
                 timeout=45
@@ -293,6 +308,63 @@ def filter_nodes_in_buffer(
     return filtered
 
 
+def filter_nodes_in_buffer_multi(
+    nodes,
+    centers: List[Tuple[float, float]],
+    radii,
+) -> List[List[List[float]]]:
+    """
+    Batch variant of filter_nodes_in_buffer: filter the same node set
+    against many (center, radius) pairs in one call.
+
+    The node-side trigonometry (radians + cos of latitudes) depends only on
+    the nodes, so it is computed once and shared across all centers. Much
+    cheaper than calling filter_nodes_in_buffer per center when dozens of
+    buffer candidates are evaluated over the same node set.
+
+    Args:
+        nodes: numpy array or list of [lat, lon]
+        centers: list of (lat, lon) center points
+        radii: single radius in meters, or one radius per center
+
+    Returns:
+        List with one filtered node list per center
+    """
+    if not isinstance(nodes, np.ndarray):
+        arr = np.array(nodes) if nodes else np.empty((0, 2))
+    else:
+        arr = nodes
+
+    if np.isscalar(radii):
+        radii = [radii] * len(centers)
+    if len(radii) != len(centers):
+        raise ValueError("radii must be a scalar or have one entry per center")
+
+    if len(arr) == 0:
+        return [[] for _ in centers]
+
+    R = 6371000.0  # Earth radius in meters
+
+    # Precompute node-side terms once — reused for every center
+    lat2 = np.radians(arr[:, 0])
+    lon2 = np.radians(arr[:, 1])
+    cos_lat2 = np.cos(lat2)
+
+    results = []
+    for (center_lat, center_lon), radius_m in zip(centers, radii):
+        lat1 = np.radians(center_lat)
+        dlat = lat2 - lat1
+        dlon = lon2 - np.radians(center_lon)
+
+        a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * cos_lat2 * np.sin(dlon / 2) ** 2
+        c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+        mask = (R * c) <= radius_m
+        results.append(arr[mask].tolist())
+
+    return results
+
+
 def count_nodes_in_polygons(
     nodes: np.ndarray,
     polygons: List[Dict[str, Any]],
@@ -366,6 +438,60 @@ def count_nodes_in_polygons(
     return counts
 
 
+@lru_cache(maxsize=64)
+def _utm_transformers(zone: int, north: bool) -> Tuple[pyproj.Transformer, pyproj.Transformer]:
+    """
+    Build (and cache) the WGS84↔UTM transformer pair for a zone/hemisphere.
+
+    Transformer construction re-initializes a PROJ context each time, which
+    dominates per-feature cost in batched pipelines; features in the same
+    zone share one cached pair instead.
+    """
+    proj_wgs84 = pyproj.CRS('EPSG:4326')
+    hemisphere = 'north' if north else 'south'
+    proj_utm = pyproj.CRS(f'+proj=utm +zone={zone} +{hemisphere} +datum=WGS84')
+
+    to_utm = pyproj.Transformer.from_crs(proj_wgs84, proj_utm, always_xy=True)
+    to_wgs = pyproj.Transformer.from_crs(proj_utm, proj_wgs84, always_xy=True)
+    return to_utm, to_wgs
+
+
+def utm_zone_batch(lats, lons) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized UTM zone/hemisphere assignment for many points at once.
+
+    Returns:
+        Tuple of (zones int32 array, north bool array) — callers can group
+        features by (zone, north) and fetch one cached transformer pair
+        per group via _utm_transformers.
+    """
+    zones = (np.floor_divide(np.asarray(lons) + 180, 6) + 1).astype(np.int32)
+    north = np.asarray(lats) >= 0
+    return zones, north
+
+
+def _fast_mapping(geom) -> Dict[str, Any]:
+    """
+    Build a GeoJSON-style dict for a shapely Polygon directly from its
+    packed coordinate arrays.
+
+    shapely.geometry.mapping walks the geometry and allocates a tuple per
+    vertex; for buffered polygons (resolution=64 → ~256 vertices each) the
+    .coords.xy arrays plus a single tolist() are far cheaper. Falls back
+    to mapping() for anything that is not a plain Polygon.
+    """
+    if geom.geom_type != 'Polygon':
+        return mapping(geom)
+
+    x, y = geom.exterior.coords.xy
+    rings = [list(zip(x.tolist(), y.tolist()))]
+    for interior in geom.interiors:
+        ix, iy = interior.coords.xy
+        rings.append(list(zip(ix.tolist(), iy.tolist())))
+
+    return {'type': 'Polygon', 'coordinates': rings}
+
+
 def create_buffer_circle_geojson(
     center_lat: float,
     center_lon: float,
@@ -376,19 +502,10 @@ def create_buffer_circle_geojson(
     around a point. Used for visualization.
     """
     center = Point(center_lon, center_lat)
-    
-    proj_wgs84 = pyproj.CRS('EPSG:4326')
+
     utm_zone = int((center_lon + 180) / 6) + 1
-    hemisphere = 'north' if center_lat >= 0 else 'south'
-    proj_utm = pyproj.CRS(f'+proj=utm +zone={utm_zone} +{hemisphere} +datum=WGS84')
-    
-    transformer_to_utm = pyproj.Transformer.from_crs(
-        proj_wgs84, proj_utm, always_xy=True
-    )
-    transformer_to_wgs = pyproj.Transformer.from_crs(
-        proj_utm, proj_wgs84, always_xy=True
-    )
-    
+    transformer_to_utm, transformer_to_wgs = _utm_transformers(utm_zone, center_lat >= 0)
+
     center_utm = transform(transformer_to_utm.transform, center)
     buffer_utm = center_utm.buffer(radius_m, resolution=64)
     buffer_wgs = transform(transformer_to_wgs.transform, buffer_utm)
@@ -400,7 +517,7 @@ def create_buffer_circle_geojson(
             'center_lat': center_lat,
             'center_lon': center_lon,
         },
-        'geometry': mapping(buffer_wgs),
+        'geometry': _fast_mapping(buffer_wgs),
     }
 
 
@@ -425,33 +542,55 @@ def create_polygon_buffers(
     """
     poly = shape(geometry)
     centroid = poly.centroid
-    
-    # Set up UTM projection
-    proj_wgs84 = pyproj.CRS('EPSG:4326')
+
+    # Set up UTM projection (transformer pair cached per zone/hemisphere)
     utm_zone = int((centroid.x + 180) / 6) + 1
-    hemisphere = 'north' if centroid.y >= 0 else 'south'
-    proj_utm = pyproj.CRS(f'+proj=utm +zone={utm_zone} +{hemisphere} +datum=WGS84')
-    
-    transformer_to_utm = pyproj.Transformer.from_crs(
-        proj_wgs84, proj_utm, always_xy=True
-    )
-    transformer_to_wgs = pyproj.Transformer.from_crs(
-        proj_utm, proj_wgs84, always_xy=True
-    )
-    
+    transformer_to_utm, transformer_to_wgs = _utm_transformers(utm_zone, centroid.y >= 0)
+
     # Project polygon to UTM
     poly_utm = transform(transformer_to_utm.transform, poly)
     
-    # Create buffers
+    # Create all buffers in one vectorized GEOS call (Shapely 2.x) —
+    # avoids per-distance Python dispatch and releases the GIL once
+    buffered_utm = shapely.buffer(
+        np.full(len(distances), poly_utm, dtype=object),
+        np.asarray(distances, dtype=np.float64),
+        quad_segs=64,
+    )
+
     result = []
-    for dist in distances:
-        buffered_utm = poly_utm.buffer(dist, resolution=64)
-        buffered_wgs = transform(transformer_to_wgs.transform, buffered_utm)
-        result.append(mapping(buffered_wgs))
-    
+    for buffered in buffered_utm:
+        buffered_wgs = transform(transformer_to_wgs.transform, buffered)
+        result.append(_fast_mapping(buffered_wgs))
+
     return result
 
 
+def create_polygon_buffers_multi(
+    geometries: List[Dict[str, Any]],
+    distances: List[float],
+) -> List[List[Dict[str, Any]]]:
+    """
+    Create buffers for many independent source polygons in parallel.
+
+    Each geometry's reproject/buffer/mapping work is CPU-bound inside GEOS,
+    which releases the GIL under Shapely 2.x, so a thread pool gives
+    per-core scaling when an LI project has many establishments.
+
+    Args:
+        geometries: list of GeoJSON geometry dicts (Polygon)
+        distances: list of buffer distances in meters (shared by all)
+
+    Returns:
+        One list of buffered geometry dicts per input geometry
+    """
+    if not geometries:
+        return []
+
+    with ThreadPoolExecutor(max_workers=min(len(geometries), os.cpu_count() or 1)) as ex:
+        return list(ex.map(lambda g: create_polygon_buffers(g, distances), geometries))
+
+
 # ==========================================
 # AOI PROJECT ASSEMBLY
 # ==========================================
@@ -481,43 +620,39 @@ def build_li_project_geojson(
     # Step 1: Generate base AOI project
     base_geojson, _ = generate_aoi_project(country_code, region_code, city_name)
     
-    # Step 2: Modify features
-    new_features = []
-    
-    for feature in base_geojson.get('features', []):
+    # Step 2: Modify features in place — no copy of the base feature list,
+    # which can hold tens of thousands of municipality polygons
+    features = base_geojson.get('features', [])
+
+    for feature in features:
         props = feature.get('properties', {})
         fid = props.get('id', '')
-        
+
         if fid.startswith('AOI-'):
             # City polygon → change to DIS- (periphery)
-            props['id'] = fid.replace('AOI-', 'DIS-')
+            props['id'] = 'DIS-' + fid[4:]
             props['poly_type'] = 'periphery'
-        
-        new_features.append(feature)
-    
+
     # Step 3: Add establishment polygons as AOI-
-    for i, est in enumerate(establishments):
-        est_props = est.get('properties', {})
-        est_name = est_props.get('name', f'Establishment {i+1}')
-        # Use custom id if provided (e.g., buffer polygons like AOI-1-50),
-        # otherwise generate sequential AOI-{i+1}
-        est_id = est_props.get('id', f'AOI-{i+1}')
-        est_poly_type = est_props.get('poly_type', 'core')
-        
-        new_features.append({
+    # Use custom id if provided (e.g., buffer polygons like AOI-1-50),
+    # otherwise generate sequential AOI-{i+1}
+    features.extend(
+        {
             'type': 'Feature',
             'properties': {
-                'id': est_id,
-                'name': est_name,
-                'poly_type': est_poly_type,
+                'id': est.get('properties', {}).get('id', f'AOI-{i+1}'),
+                'name': est.get('properties', {}).get('name', f'Establishment {i+1}'),
+                'poly_type': est.get('properties', {}).get('poly_type', 'core'),
             },
             'geometry': est.get('geometry'),
-        })
-    
+        }
+        for i, est in enumerate(establishments)
+    )
+
     # Build final GeoJSON
     final_geojson = {
         'type': 'FeatureCollection',
-        'features': new_features,
+        'features': features,
     }
     
     # Generate filename
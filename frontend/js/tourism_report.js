@@ -14,7 +14,8 @@ const state = {
     projectId: '',
     aoiId: '',
     selectedMonths: [],
-    csvDataB64: null
+    csvDataB64: null,
+    csvEncoding: null
 };
 
 // ══════════════════════════════════════════
@@ -256,6 +257,7 @@ $('#btn-back-error')?.addEventListener('click', () => {
 
 $('#btn-new-report')?.addEventListener('click', () => {
     state.csvDataB64 = null;
+    state.csvEncoding = null;
     state.selectedMonths = [];
     state.projectId = '';
     state.aoiId = '';
@@ -265,9 +267,15 @@ $('#btn-new-report')?.addEventListener('click', () => {
     goToStep(2);
 });
 
-function downloadBase64CSV(b64, filename) {
+async function downloadBase64CSV(b64, filename, encoding) {
     const bin = window.atob(b64);
-    const blob = new Blob([bin], { type: 'text/csv;charset=utf-8' });
+    let bytes = Uint8Array.from(bin, c => c.charCodeAt(0));
+    if (encoding === 'gzip+base64') {
+        // Backend gzips the CSV before base64 — inflate with the native stream API
+        const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('gzip'));
+        bytes = new Uint8Array(await new Response(stream).arrayBuffer());
+    }
+    const blob = new Blob([bytes], { type: 'text/csv;charset=utf-8' });
     const url = URL.createObjectURL(blob);
     const a = document.createElement('a');
     a.href = url;
@@ -280,7 +288,7 @@ function downloadBase64CSV(b64, filename) {
 
 $('#btn-download-csv')?.addEventListener('click', () => {
     if (state.csvDataB64) {
-        downloadBase64CSV(state.csvDataB64, `tourism_${state.aoiId}_data.csv`);
+        downloadBase64CSV(state.csvDataB64, `tourism_${state.aoiId}_data.csv`, state.csvEncoding);
     }
 });
 
@@ -402,6 +410,7 @@ async function generateReport() {
         }
 
         state.csvDataB64 = chartData.summary.csv_data || null;
+        state.csvEncoding = chartData.summary.csv_encoding || null;
 
         setProgress(100, 'Done!');
         log('✅ Tourism report generated successfully!', 'success');
@@ -473,7 +482,7 @@ function showResults(summary) {
         chartKeys.forEach(key => {
             const img = $(`#chart-${key}`);
             if (img && summary.charts[key]) {
-                img.src = `data:image/png;base64,${summary.charts[key]}`;
+                img.src = `data:image/webp;base64,${summary.charts[key]}`;
             }
         });
     }